@@ -1,3 +1,7 @@
+import hashlib
+import os
+import re
+
 from dotenv import load_dotenv
 
 # Load environment variables from a .env file
@@ -10,9 +14,17 @@ from starlette.middleware import Middleware
 from wellaios.authenticate import (
     AuthenticationMiddleware,
 )
-from wellaios.crypto_plot import plot_crypto, plot_heatmap
+from wellaios.crypto_plot import (
+    crypto_data,
+    get_cached_plot,
+    get_plot_path,
+    heatmap_data,
+    plot_crypto,
+    plot_heatmap,
+    render_png,
+)
 from starlette.requests import Request
-from starlette.responses import PlainTextResponse, Response
+from starlette.responses import FileResponse, PlainTextResponse, Response
 
 import uvicorn
 
@@ -32,7 +44,7 @@ async def price_chat_plt(symbol: str) -> str:
         str: The URL of the saved chart image.
              Returns Error message if there is an error during the plotting or saving process.
     """
-    return plot_crypto(symbol)
+    return await plot_crypto(symbol)
 
 
 @mcp.tool()
@@ -45,20 +57,137 @@ async def price_heatmap_plt() -> str:
         str: The URL of the saved chart image.
              Returns an error message if plotting or saving fails.
     """
-    return plot_heatmap()
+    return await plot_heatmap()
+
+
+@mcp.tool()
+async def price_chat_data(symbol: str) -> str:
+    """
+    Retrieves the daily OHLCV (Open-High-Low-Close-Volume) data of the specified
+    cryptocurrency symbol, for rendering the chart on the client side.
+
+    Args:
+        symbol (str): The ticker symbol of the cryptocurrency on CoinMarketCap (e.g., 'BTC', 'ETH', '$well').
+
+    Returns:
+        str: A JSON string with the name and symbol of the cryptocurrency under "meta",
+             and its daily quotes, ending with the latest one, under "ohlcv".
+             Returns Error message if there is an error during data retrieval.
+    """
+    return await crypto_data(symbol)
+
+
+@mcp.tool()
+async def price_heatmap_data() -> str:
+    """
+    Retrieves the market data (i.e, price, price change and volume change) of the
+    current top 20 trending cryptocurrencies, for rendering the heatmap on the
+    client side.
+
+    Returns:
+        str: A JSON string of the market data of each cryptocurrency.
+             Returns an error message if data retrieval fails.
+    """
+    return await heatmap_data()
+
+
+def accepts_gzip(accept_encoding: str) -> bool:
+    """
+    Checks whether an Accept-Encoding header value allows a gzip-encoded response.
+
+    Args:
+        accept_encoding: The value of the Accept-Encoding request header.
+
+    Returns:
+        bool: True if gzip, or the "*" wildcard when gzip is not listed, has a
+              non-zero quality value.
+    """
+    qualities: dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        coding, _, params = item.partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[coding] = quality
+    return qualities.get("gzip", qualities.get("*", 0.0)) > 0
+
+
+# Chart file IDs are the hex form of a UUID4, see generate_unique_file_id.
+# Charts generated before used the hyphenated form, which is still accepted.
+FILE_ID_RE = re.compile(
+    r"(?:[0-9a-f]{32}|[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12})\Z"
+)
 
 
 @mcp.custom_route("/plts", methods=["GET"])
 async def get_chart(request: Request):
-    file_id = request.query_params.get("id")
-    try:
-        with open(f"plts/{file_id}.svg", "rb") as f:
-            headers = {"Content-Disposition": "inline"}
-            return Response(
-                content=f.read(), media_type="image/svg+xml", headers=headers
-            )
-    except Exception:
+    file_id = request.query_params.get("id", "")
+    # Reject anything but a generated ID up front, without touching the disk.
+    # This also prevents path traversal out of the plots folder.
+    if not FILE_ID_RE.match(file_id):
         return PlainTextResponse("File ID error", status_code=400)
+    # Charts are never modified once generated, so clients and CDNs may cache
+    # them indefinitely.
+    headers = {
+        "Content-Disposition": "inline",
+        "Cache-Control": "public, max-age=31536000, immutable",
+    }
+    # Serve a PNG if requested with "fmt=png", and the SVG otherwise. The SVG is
+    # sent pre-compressed to clients accepting gzip.
+    if request.query_params.get("fmt") == "png":
+        fmt = "png"
+        media_type = "image/png"
+    else:
+        headers["Vary"] = "Accept-Encoding"
+        media_type = "image/svg+xml"
+        if accepts_gzip(request.headers.get("Accept-Encoding", "")):
+            fmt = "svgz"
+        else:
+            fmt = "svg"
+    # Serve recently generated charts straight from memory.
+    content = get_cached_plot(file_id, fmt)
+    path = get_plot_path(file_id, fmt)
+    # Charts saved before the SVG was pre-compressed have no gzipped copy, so
+    # send them uncompressed.
+    if content is None and fmt == "svgz" and not os.path.isfile(path):
+        fmt = "svg"
+        path = get_plot_path(file_id, fmt)
+    if fmt == "svgz":
+        headers["Content-Encoding"] = "gzip"
+    # Look the chart up first, so that unknown or deleted charts are never
+    # reported as unchanged.
+    if content is None and not os.path.isfile(path):
+        # The PNG is only rendered the first time it is requested.
+        if fmt == "png":
+            content = await render_png(file_id)
+        if content is None:
+            return PlainTextResponse("File ID error", status_code=400)
+    # The ID and format fully determine the content, so derive the ETag from them
+    # and answer revalidations without sending the chart.
+    digest = hashlib.blake2b(f"{file_id}.{fmt}".encode(), digest_size=8).hexdigest()
+    etag = f'"{digest}"'
+    headers["ETag"] = etag
+    if_none_match = request.headers.get("If-None-Match", "")
+    if etag in (tag.strip() for tag in if_none_match.split(",")):
+        # A 304 has no body, so only send the headers describing the cached one.
+        not_modified_headers = {
+            key: value
+            for key, value in headers.items()
+            if key in ("ETag", "Cache-Control", "Vary")
+        }
+        return Response(status_code=304, headers=not_modified_headers)
+    if content is None:
+        # Otherwise stream the file from disk, using sendfile where available.
+        return FileResponse(path, media_type=media_type, headers=headers)
+    return Response(content=content, media_type=media_type, headers=headers)
 
 
 if __name__ == "__main__":
@@ -1,13 +1,22 @@
+import asyncio
 import base64
-import json
+import copy
+import functools
+import gzip
+import orjson
 import os
+import pickle
+import time
 import uuid
+from collections import OrderedDict
+from datetime import datetime
+import numpy as np
 import pandas as pd
-import requests
+import httpx
 import plotly.graph_objects as go
-import math
+import plotly.io as pio
 from plotly.subplots import make_subplots
-from typing import TypedDict
+from typing import Any, TypedDict
 
 # Load environment variables. These should be set securely.
 SERVER_DOMAIN = os.environ.get("SERVER_DOMAIN")  # Base URL of your server
@@ -29,10 +38,80 @@ LATEST_API = "https://pro-api.coinmarketcap.com/v2/cryptocurrency/ohlcv/latest"
 HISTORICAL_API = "https://pro-api.coinmarketcap.com/v2/cryptocurrency/ohlcv/historical"
 HEATMAP_API = "https://pro-api.coinmarketcap.com/v1/cryptocurrency/trending/latest"
 
+# Shared asynchronous HTTP client for CoinMarketCap. Connections are kept alive
+# and pooled across calls, and requests do not block the event loop.
+# httpx rejects None header values, so leave out the unset ones (e.g., no CMC_KEY).
+_HTTPX = httpx.AsyncClient(
+    headers={k: v for k, v in CMC_HEADER.items() if v is not None},
+    timeout=httpx.Timeout(10.0, connect=3.0),
+    # Pool settings live on the transport, which also retries failed connects.
+    transport=httpx.AsyncHTTPTransport(
+        http2=True, limits=httpx.Limits(max_connections=20), retries=2
+    ),
+)
+
+# Time-to-live (in seconds) of cached CoinMarketCap responses, per endpoint.
+HISTORICAL_TTL = 60  # Daily candles barely change intra-day
+LATEST_TTL = 10  # Latest quote should stay fresh
+HEATMAP_TTL = 30
+
+# In-process cache of parsed CoinMarketCap responses, keyed by (url, params).
+# Each value is an (expiry, data) pair, where expiry is from time.monotonic().
+# Expired entries are dropped whenever a response is added, which bounds the
+# cache to the responses fetched within the longest TTL.
+# It is only accessed from the event loop.
+_cache: dict[tuple, tuple[float, Any]] = {}
+# Requests currently in flight, keyed like `_cache`, so that concurrent misses
+# for the same key share a single request.
+_inflight: dict[tuple, asyncio.Task] = {}
+
+# Maximum count of charts kept in the `FOLDER`. Once exceeded, the least
+# recently generated charts are deleted. The count is kept per process: each
+# worker counts the charts found at start-up and those it saved since, so with
+# several workers the `FOLDER` may hold more charts than this.
+MAX_SAVED_PLOTS = 1000
+
+# Minimum age (in seconds) of the leftover files deleted by `scan_saved_plots`.
+STALE_FILE_AGE = 60
+
+# Formats a chart can be saved in, mapped to their file extension.
+# "svgz" is the SVG pre-compressed with gzip, for clients accepting that encoding.
+# "figure" is the Plotly figure as JSON, from which the "png" is rendered only
+# when it is first requested, keeping rasterization off the tool call.
+PLOT_FORMATS = {
+    "svg": "svg",
+    "svgz": "svg.gz",
+    "figure": "json",
+    "png": "png",
+}
+
+# In-memory LRU cache of rendered charts, keyed by file ID and then by format,
+# so recently generated charts are served from RAM. It is only accessed from
+# the event loop.
+PLOT_CACHE_SIZE = 256
+_plot_cache: OrderedDict[str, dict[str, bytes]] = OrderedDict()
+
+# IDs of the charts saved in the `FOLDER`, from oldest to newest.
+# It is only accessed from the event loop.
+_plot_files: OrderedDict[str, None] = OrderedDict()
+
+# PNG renders currently in flight, keyed by file ID, so that concurrent first
+# requests for the same PNG share a single render.
+# It is only accessed from the event loop.
+_png_renders: dict[str, asyncio.Task] = {}
+
 # In a production environment, you should implement a mechanism to regularly
 # synchronize this file with the latest data from CoinMarketCap's API
 # (e.g., using their /v1/cryptocurrency/map endpoint) to ensure accuracy and completeness.
 COIN_FILE_NAME = "cmc_coin_list.json"
+# Pickled copy of the lookup dictionaries built from `COIN_FILE_NAME`, so they
+# are not rebuilt on every import. It is regenerated whenever the JSON file changes,
+# or when its `COIN_CACHE_VERSION` differs, i.e., `get_coin_list` has changed.
+COIN_CACHE_FILE_NAME = "cmc_coin_list.pkl"
+COIN_CACHE_VERSION = 2
+
+# HTML label of a heatmap block, from its font size (in em), symbol, and text.
+HEATMAP_LABEL = "<span style='font-size: {}em;'>{}</span><br />{}"
 
 
 class CoinDetails(TypedDict):
@@ -46,173 +125,406 @@ class CoinDetails(TypedDict):
     name: str  # Full name (e.g., "Bitcoin", "Ethereum")
 
 
-def get_coin_list() -> dict[str, CoinDetails]:
+def get_coin_list() -> tuple[dict[str, CoinDetails], dict[str, CoinDetails]]:
     """
     Loads the list of cryptocurrencies from a local JSON file.
 
-    The function reads 'cmc_coin_list.json', parses it, and returns a dictionary
-    mapping lowercase coin symbols to their details. This allows for quick lookup
-    by symbol.
+    The function reads 'cmc_coin_list.json', parses it, and returns two
+    dictionaries mapping lowercase coin symbols and lowercase coin slugs to their
+    details. This allows for quick lookup by either symbol or slug.
 
     Returns:
-        A dictionary where keys are lowercase cryptocurrency symbols and values
-        are CoinDetails TypedDicts.
+        A tuple of two dictionaries, keyed by lowercase cryptocurrency symbols
+        and lowercase slugs respectively, whose values are CoinDetails TypedDicts.
     """
     # Open and load the JSON file containing coin data.
-    with open(COIN_FILE_NAME) as f:
-        data: list[CoinDetails] = json.load(f)
+    with open(COIN_FILE_NAME, "rb") as f:
+        data: list[CoinDetails] = orjson.loads(f.read())
     result: dict[str, CoinDetails] = {}
-    # Iterate through the list and populate the dictionary, prioritizing the first
-    # entry for a given symbol if duplicates exist.
+    slugs: dict[str, CoinDetails] = {}
+    # Iterate through the list and populate the dictionaries, prioritizing the first
+    # entry for a given symbol or slug if duplicates exist.
     for x in data:
         sym = x["symbol"].lower()  # for case-insensitive
         if (
             sym not in result
         ):  # only map to the first appearance of the token with the same symbol
             result[sym] = x
+    # Only map the slugs of the tokens kept above. Data is fetched by symbol, so
+    # the slug of a token shadowed by another one with the same symbol would
+    # otherwise be plotted with the data of that other token.
+    for x in result.values():
+        slugs.setdefault(x["slug"].lower(), x)
+    return result, slugs
+
+
+def load_coin_list() -> tuple[dict[str, CoinDetails], dict[str, CoinDetails]]:
+    """
+    Loads the coin lookup dictionaries, using the pickled cache when it is up to date.
+
+    The cache is considered up to date if it was written after the last
+    modification of 'cmc_coin_list.json' with the current `COIN_CACHE_VERSION`.
+    Otherwise, the dictionaries are rebuilt with `get_coin_list` and the cache
+    is refreshed.
+
+    Returns:
+        The same tuple of dictionaries as `get_coin_list`.
+    """
+    try:
+        if os.path.getmtime(COIN_CACHE_FILE_NAME) >= os.path.getmtime(COIN_FILE_NAME):
+            with open(COIN_CACHE_FILE_NAME, "rb") as f:
+                version, cached = pickle.load(f)
+            if version == COIN_CACHE_VERSION:
+                return cached
+    except Exception:
+        pass  # Missing, unreadable or outdated cache, rebuild it below
+
+    result = get_coin_list()
+    try:
+        with open(COIN_CACHE_FILE_NAME, "wb") as f:
+            pickle.dump((COIN_CACHE_VERSION, result), f, protocol=5)
+    except Exception as e:
+        print(f"Error caching the coin list: {e}")
     return result
 
 
-# Load the coin list once when the module is imported.
-coin_list: dict[str, CoinDetails] = get_coin_list()
+async def _fetch(key: tuple, url: str, params: dict[str, Any], ttl: float) -> Any:
+    """
+    Performs a GET request to the CoinMarketCap API and caches the parsed JSON.
+
+    Expired entries are dropped from the cache at the same time.
+
+    Args:
+        key: The cache key of the request.
+        url: The API endpoint to query.
+        params: The query parameters of the request.
+        ttl: The time (in seconds) for which the response is cached.
+
+    Returns:
+        The parsed JSON response.
+
+    Raises:
+        httpx.HTTPStatusError: If the API responds with an error status code.
+    """
+    response = await _HTTPX.get(url, params=params)
+    response.raise_for_status()
+    data = orjson.loads(response.content)
+    now = time.monotonic()
+    for stale in [k for k, (expiry, _) in _cache.items() if expiry <= now]:
+        del _cache[stale]
+    _cache[key] = (now + ttl, data)
+    return data
+
+
+def _task_done(tasks: dict[Any, asyncio.Task], key: Any, task: asyncio.Task) -> None:
+    """
+    Removes a finished task from the in-flight ones.
+
+    Args:
+        tasks: The in-flight tasks, such as `_inflight`.
+        key: The key of the task in `tasks`.
+        task: The finished task.
+    """
+    tasks.pop(key, None)
+    if not task.cancelled():
+        task.exception()  # Mark as retrieved, the callers report it
+
+
+async def _cached_get(url: str, params: dict[str, Any], ttl: float) -> Any:
+    """
+    Performs a GET request to the CoinMarketCap API, caching the parsed JSON.
+
+    A cached response is returned if the same (url, params) pair was fetched
+    less than `ttl` seconds ago. Otherwise, the request is issued and the result
+    is stored in the cache. Concurrent calls for the same pair wait for the same
+    request. Failed requests are never cached.
+
+    Args:
+        url: The API endpoint to query.
+        params: The query parameters of the request.
+        ttl: The maximum age (in seconds) of a cached response.
+
+    Returns:
+        The parsed JSON response.
+
+    Raises:
+        httpx.HTTPStatusError: If the API responds with an error status code.
+    """
+    key = (url, frozenset(params.items()))
+    entry = _cache.get(key)
+    if entry is not None and time.monotonic() < entry[0]:
+        return entry[1]
+
+    task = _inflight.get(key)
+    if task is None:
+        task = asyncio.create_task(_fetch(key, url, params, ttl))
+        task.add_done_callback(functools.partial(_task_done, _inflight, key))
+        _inflight[key] = task
+    # Shield the shared request, so a cancelled caller does not cancel it for
+    # the others.
+    return await asyncio.shield(task)
+
+
+def warm_up_renderer() -> None:
+    """
+    Starts the Kaleido renderer used by Plotly to export images.
+
+    Kaleido spawns a Chromium subprocess on its first export and keeps it alive
+    afterwards. Rendering an empty figure at import time moves that start-up cost
+    out of the first chart request served by each worker.
+    """
+    try:
+        pio.to_image(go.Figure(), format="svg")
+    except Exception as e:
+        print(f"Error warming up the Kaleido renderer: {e}")
 
 
 def generate_unique_file_id() -> str:
     """
     Generates a unique filename (ID) using UUID4.
 
-    The function creates a random UUID and checks if a file with that name
-    (plus '.svg' extension) already exists in the `FOLDER`. It retries
-    until a unique ID is found.
+    UUID4 collisions are practically impossible, so no check against existing
+    files in the `FOLDER` is performed.
 
     Returns:
         str: A unique identifier string suitable for a filename.
     """
-    while True:
-        file_id = str(uuid.uuid4())  # Generate a new UUID
-        filename = f"{file_id}.svg"  # Append .svg extension
-        file_path = os.path.join(FOLDER, filename)  # Construct full path
-        if not os.path.exists(file_path):  # Check if the file already exists
-            return file_id
+    return uuid.uuid4().hex
 
 
-def plot_crypto(symbol: str) -> str:
+def render_plot(fig: go.Figure) -> dict[str, bytes]:
     """
-    Generates and saves an OHLCV (Open-High-Low-Close-Volume) candlestick chart
-    for a given cryptocurrency symbol.
+    Renders a Plotly figure in every format of `PLOT_FORMATS` except "png", which
+    is rendered on demand by `render_png`.
 
-    It fetches historical and latest OHLCV data from CoinMarketCap, processes it,
-    creates a Plotly chart, and saves it as an SVG file. A URL to the saved chart
-    is returned.
+    Args:
+        fig: The Plotly figure to render.
+
+    Returns:
+        A dictionary mapping each format to the rendered bytes.
+    """
+    svg = fig.to_image(format="svg", width=1200, height=600)
+    return {
+        "svg": svg,
+        "svgz": gzip.compress(svg, compresslevel=6),
+        "figure": fig.to_json().encode(),
+    }
+
+
+async def save_plot(fig: go.Figure) -> str:
+    """
+    Renders a Plotly figure, saves it in the `FOLDER` in the formats returned by
+    `render_plot`, and keeps a copy in the in-memory plot cache so it can be
+    served without disk I/O.
 
     Args:
-        symbol: The cryptocurrency symbol (e.g., "BTC", "ETH") or slug (e.g., "bitcoin")
-                to plot. Note that only token on the list is allowed.
+        fig: The Plotly figure to render.
 
     Returns:
-        A string containing a URL to the generated chart, or an error message if the
-        token is not found or data retrieval fails.
+        str: The file ID of the saved chart.
     """
-    # Find the coin details using either symbol or slug (case-insensitive).
-    coin = None
-    sym_low = symbol.lower()
-    if sym_low in coin_list:
-        coin = coin_list[sym_low]
-    else:
-        for x in coin_list:
-            if sym_low == coin_list[x]["slug"]:
-                coin = coin_list[x]
-                break
+    file_id = generate_unique_file_id()
+    # Render the Plotly figure. Rendering is CPU-bound, so run it
+    # in a worker thread to keep the event loop responsive.
+    images = await asyncio.to_thread(render_plot, fig)
 
-    if coin is None:
-        return f"Token {symbol} not found. Please provide a valid cryptocurrency symbol or slug."
+    # Create the directory to save plots if it doesn't exist, then write each image once.
+    os.makedirs(FOLDER, exist_ok=True)
+    for fmt, content in images.items():
+        write_plot_file(file_id, fmt, content)
 
-    # --- Get historical data ---
-    params = {
-        "symbol": coin["symbol"],
-        "count": 100,
-    }
-    try:
-        response = requests.get(HISTORICAL_API, headers=CMC_HEADER, params=params)
-        response.raise_for_status()
-        data = response.json()
+    # Insert into the cache as the most recently used entry, evicting the least
+    # recently used ones beyond capacity.
+    _plot_cache[file_id] = images
+    _plot_cache.move_to_end(file_id)
+    while len(_plot_cache) > PLOT_CACHE_SIZE:
+        _plot_cache.popitem(last=False)
 
-        values = [
-            x["quote"]["USD"] for x in data["data"][coin["symbol"].upper()][0]["quotes"]
-        ]
-        df = pd.DataFrame(values)
+    # Track the new chart and delete the oldest ones to bound disk use.
+    _plot_files[file_id] = None
+    while len(_plot_files) > MAX_SAVED_PLOTS:
+        old_id, _ = _plot_files.popitem(last=False)
+        delete_plot(old_id)
+    return file_id
 
-        # 'market_cap' is not needed for OHLCV plot, so drop it.
-        df.drop(columns="market_cap", inplace=True)
-    except Exception as e:
-        return f"An unexpected error occurred during historical data processing for {symbol}: {e}"
 
-    # --- Get latest price data ---
-    params = {
-        "symbol": coin["symbol"],
-    }
-    try:
-        response = requests.get(LATEST_API, headers=CMC_HEADER, params=params)
-        response.raise_for_status()
-        data = response.json()
+async def render_png(file_id: str) -> bytes | None:
+    """
+    Renders the PNG of a saved chart from its figure, then saves and caches it
+    so later requests are served without rendering again.
 
-        new_data = data["data"][coin["symbol"].upper()][0]["quote"]["USD"]
+    Concurrent calls for the same chart wait for the same render.
 
-        new_data["timestamp"] = new_data["last_updated"]
-        new_data.pop("last_updated")  # Remove original key
-    except Exception as e:
-        return f"An unexpected error occurred during latest data processing for {symbol}: {e}"
+    Args:
+        file_id: The file ID returned by `save_plot`.
 
-    # Combine historical and latest data into a single DataFrame.
-    df = pd.concat([df, pd.DataFrame([new_data])], ignore_index=True)
-    # Convert the 'timestamp' column to datetime objects for proper plotting.
-    df["timestamp"] = pd.to_datetime(df["timestamp"])
+    Returns:
+        The PNG bytes of the chart, or None if the chart does not exist.
+    """
+    task = _png_renders.get(file_id)
+    if task is None:
+        task = asyncio.create_task(_render_png(file_id))
+        task.add_done_callback(functools.partial(_task_done, _png_renders, file_id))
+        _png_renders[file_id] = task
+    # Shield the shared render, so a cancelled caller does not cancel it for
+    # the others.
+    return await asyncio.shield(task)
 
-    # --- Plot the chart using Plotly ---
-    fig = make_subplots(
-        rows=2, cols=1, shared_xaxes=True, vertical_spacing=0.08, row_heights=[0.7, 0.3]
-    )  # Allocate more space to OHLC chart (row 1)
 
-    # Add Candlestick Trace to the first row.
-    fig.add_trace(
-        go.Candlestick(
-            x=df["timestamp"].dt.date,  # Use date only for x-axis ticks
-            open=df["open"],
-            high=df["high"],
-            low=df["low"],
-            close=df["close"],
-            name="Price",  # Name for the legend
-        ),
-        row=1,
-        col=1,
-    )
+async def _render_png(file_id: str) -> bytes | None:
+    """
+    Renders, saves and caches the PNG of a saved chart, see `render_png`.
 
-    # Add Volume Bar Trace to the second row.
-    fig.add_trace(
-        go.Bar(
-            x=df["timestamp"].dt.date,
-            y=df["volume"],
-            name="Volume",
-            marker_color="rgba(0, 0, 255, 0.5)",
-        ),
-        row=2,
-        col=1,
+    Args:
+        file_id: The file ID returned by `save_plot`.
+
+    Returns:
+        The PNG bytes of the chart, or None if the chart does not exist.
+    """
+    figure = get_cached_plot(file_id, "figure")
+    if figure is None:
+        try:
+            with open(get_plot_path(file_id, "figure"), "rb") as f:
+                figure = f.read()
+        except FileNotFoundError:
+            return None
+    # Rasterization is CPU-bound, so run it in a worker thread.
+    png = await asyncio.to_thread(
+        pio.to_image, orjson.loads(figure), format="png", width=1200, height=600
     )
 
-    # Try to load and embed a cryptocurrency logo image (if available) for the chart.
-    img_base64 = None
+    # The chart may have been deleted while rendering, in which case the PNG
+    # must not be saved, as nothing would delete it. Its SVG is checked rather
+    # than `_plot_files`, which misses the charts saved by other processes.
+    if os.path.isfile(get_plot_path(file_id, "svg")):
+        write_plot_file(file_id, "png", png)
+    images = _plot_cache.get(file_id)
+    if images is not None:
+        images["png"] = png
+    return png
+
+
+def write_plot_file(file_id: str, fmt: str, content: bytes) -> None:
+    """
+    Writes a chart file in the `FOLDER` atomically.
+
+    The content is written to a temporary file first, then moved into place, so
+    a concurrent request never serves a partially written chart.
+
+    Args:
+        file_id: The file ID returned by `save_plot`.
+        fmt: One of the formats of `PLOT_FORMATS`.
+        content: The bytes of the chart in that format.
+    """
+    path = get_plot_path(file_id, fmt)
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
     try:
-        # Assumes image files are stored in an 'images' folder and named by Coin ID.
-        with open(f"images/{coin['id']}.png", "rb") as f:
-            # Read image, base64 encode it, and format for Plotly image source.
-            encoded_string = base64.b64encode(f.read()).decode("utf-8")
-            img_base64 = f"data:image/png;base64,{encoded_string}"
-    except Exception as e:
-        print(f"Error loading image for coin ID {coin['id']}: {e}")
+        with open(tmp_path, "wb") as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+def delete_plot(file_id: str) -> None:
+    """
+    Deletes a saved chart, in every format, from the `FOLDER` and the plot cache.
+
+    Args:
+        file_id: The file ID returned by `save_plot`.
+    """
+    _plot_cache.pop(file_id, None)
+    for fmt in PLOT_FORMATS:
+        try:
+            os.unlink(get_plot_path(file_id, fmt))
+        except FileNotFoundError:
+            pass
+
+
+def scan_saved_plots() -> None:
+    """
+    Registers the charts already present in the `FOLDER`, oldest first, so that
+    charts saved by previous runs are also subject to `MAX_SAVED_PLOTS`.
+
+    Leftovers older than `STALE_FILE_AGE` are deleted: the temporary files of
+    interrupted writes, and the files of charts whose SVG is gone.
+    """
+    try:
+        entries = [entry for entry in os.scandir(FOLDER) if entry.is_file()]
+    except FileNotFoundError:
+        return
+    svg_entries = [entry for entry in entries if entry.name.endswith(".svg")]
+    file_ids = {entry.name.removesuffix(".svg") for entry in svg_entries}
+
+    # Files still being written or deleted by other processes are recent, so
+    # only delete the older ones.
+    cutoff = time.time() - STALE_FILE_AGE
+    for entry in entries:
+        if entry.name.endswith(".svg"):
+            continue
+        file_id = entry.name.split(".", 1)[0]
+        if entry.name.endswith(".tmp") or file_id not in file_ids:
+            try:
+                if entry.stat().st_mtime < cutoff:
+                    os.unlink(entry.path)
+            except FileNotFoundError:
+                pass
+
+    svg_entries.sort(key=lambda entry: entry.stat().st_mtime)
+    for entry in svg_entries:
+        _plot_files[entry.name.removesuffix(".svg")] = None
+
+
+def get_plot_path(file_id: str, fmt: str = "svg") -> str:
+    """
+    Builds the path of a saved chart file.
+
+    Args:
+        file_id: The file ID returned by `save_plot`.
+        fmt: One of the formats of `PLOT_FORMATS`.
+
+    Returns:
+        str: The path of the chart file in the `FOLDER`.
+    """
+    return os.path.join(FOLDER, f"{file_id}.{PLOT_FORMATS[fmt]}")
+
+
+def get_cached_plot(file_id: str, fmt: str = "svg") -> bytes | None:
+    """
+    Looks up a rendered chart in the in-memory plot cache.
+
+    Args:
+        file_id: The file ID returned by `save_plot`.
+        fmt: One of the formats of `PLOT_FORMATS`.
+
+    Returns:
+        The image bytes of the chart, or None if it is not cached.
+    """
+    images = _plot_cache.get(file_id)
+    if images is None:
+        return None
+    _plot_cache.move_to_end(file_id)  # Mark as recently used
+    return images.get(fmt)
+
+
+def build_crypto_template() -> go.Figure:
+    """
+    Builds the figure shared by every OHLCV chart: two stacked subplots (price and
+    volume) with the common layout, and no traces.
+
+    Returns:
+        go.Figure: The template figure, whose layout is used by `new_figure`.
+    """
+    fig = make_subplots(
+        rows=2, cols=1, shared_xaxes=True, vertical_spacing=0.08, row_heights=[0.7, 0.3]
+    )  # Allocate more space to OHLC chart (row 1)
 
     # Update chart layout settings.
     fig.update_layout(
-        title=f"{coin['name']} ({coin['symbol'].upper()}) Price & Volume",  # Chart title
         xaxis_rangeslider_visible=False,  # Hide the default range slider for a cleaner look
         title_x=0.5,  # Center the title horizontally
         title_xanchor="center",
@@ -237,13 +549,259 @@ def plot_crypto(symbol: str) -> str:
         ],
     )
 
-    # Customize x and y axis tick font size and color.
-    fig.update_xaxes(tickfont=dict(size=10, color="grey"))
-    fig.update_yaxes(tickfont=dict(size=10, color="grey"))
+    # Customize x and y axis tick font size and color, and make gridlines
+    # thinner and grey for both axes.
+    axis_style = dict(
+        tickfont=dict(size=10, color="grey"),
+        gridwidth=0.5,
+        gridcolor="rgba(100, 100, 100, 0.4)",
+    )
+    fig.update_xaxes(**axis_style)
+    fig.update_yaxes(**axis_style)
+
+    return fig
+
+
+def build_heatmap_template() -> go.Figure:
+    """
+    Builds the figure shared by every heatmap chart, with the common layout and
+    no traces.
+
+    Returns:
+        go.Figure: The template figure, whose layout is used by `new_figure`.
+    """
+    fig = go.Figure()
+    # Set margins to 0 for a tight fit, maximizing chart area.
+    fig.update_layout(margin=dict(t=0, l=0, r=0, b=0))
+    return fig
+
+
+@functools.lru_cache(maxsize=512)
+def load_coin_logo(coin_id: int) -> str | None:
+    """
+    Loads the logo of a cryptocurrency as a base64 data URI, for Plotly image source.
+
+    Results are memoized per coin ID, so each logo is read and encoded only once.
+
+    Args:
+        coin_id: The CoinMarketCap ID of the cryptocurrency.
+
+    Returns:
+        The logo as a data URI, or None if it cannot be loaded.
+    """
+    try:
+        # Assumes image files are stored in an 'images' folder and named by Coin ID.
+        with open(f"images/{coin_id}.png", "rb") as f:
+            # Read image, base64 encode it, and format for Plotly image source.
+            encoded_string = base64.b64encode(f.read()).decode("utf-8")
+            return f"data:image/png;base64,{encoded_string}"
+    except Exception as e:
+        print(f"Error loading image for coin ID {coin_id}: {e}")
+        return None
+
+
+def new_figure(layout: dict[str, Any]) -> go.Figure:
+    """
+    Creates a figure from a prebuilt layout without validating it again.
+
+    A deep copy of a Plotly figure is rebuilt from its dictionary with full
+    validation, including the resolved theme. The layouts below were validated
+    when their template figure was built, so they can be trusted as is.
+
+    Args:
+        layout: A layout dictionary built from a template figure.
+
+    Returns:
+        go.Figure: A new figure with a copy of the layout and no traces.
+    """
+    # `_validate` is a private argument of Plotly, so keep Plotly pinned (see
+    # requirement.txt) and check this still works when upgrading it. The public
+    # alternatives, `skip_invalid=True` or a prebuilt `go.Layout`, still validate
+    # the layout and are about 8 times slower.
+    return go.Figure(layout=copy.deepcopy(layout), _validate=False)
+
+
+# Load the coin lists once when the module is imported.
+coin_list: dict[str, CoinDetails]
+slug_list: dict[str, CoinDetails]
+coin_list, slug_list = load_coin_list()
+
+# Start the renderer once when the module is imported.
+warm_up_renderer()
+
+# Register the previously saved charts once when the module is imported.
+scan_saved_plots()
+
+# Build the chart layouts once when the module is imported.
+CRYPTO_LAYOUT: dict[str, Any] = build_crypto_template().to_dict()["layout"]
+HEATMAP_LAYOUT: dict[str, Any] = build_heatmap_template().to_dict()["layout"]
+
+
+async def fetch_crypto_data(
+    symbol: str,
+) -> tuple[CoinDetails, list[dict[str, Any]]] | str:
+    """
+    Fetches the historical and latest OHLCV data of a cryptocurrency from CoinMarketCap.
+
+    Args:
+        symbol: The cryptocurrency symbol (e.g., "BTC", "ETH") or slug (e.g., "bitcoin").
+                Note that only token on the list is allowed.
+
+    Returns:
+        A tuple of the coin details and the list of USD quotes, oldest first and
+        ending with the latest one, or an error message if the token is not found
+        or data retrieval fails.
+    """
+    # Find the coin details using either symbol or slug (case-insensitive).
+    sym_low = symbol.lower()
+    coin = coin_list.get(sym_low) or slug_list.get(sym_low)
+
+    if coin is None:
+        return f"Token {symbol} not found. Please provide a valid cryptocurrency symbol or slug."
+
+    # --- Fetch historical and latest data concurrently ---
+    # The two requests are independent, so overlap their network latency.
+    # Exceptions are returned rather than raised so that each one is reported
+    # by its own processing step below.
+    historical_params = {
+        "symbol": coin["symbol"],
+        "count": 100,
+    }
+    latest_params = {
+        "symbol": coin["symbol"],
+    }
+    historical_data, latest_data = await asyncio.gather(
+        _cached_get(HISTORICAL_API, historical_params, HISTORICAL_TTL),
+        _cached_get(LATEST_API, latest_params, LATEST_TTL),
+        return_exceptions=True,
+    )
+
+    # --- Process historical data ---
+    try:
+        if isinstance(historical_data, Exception):
+            raise historical_data
+        data = historical_data
+
+        values = [
+            x["quote"]["USD"] for x in data["data"][coin["symbol"].upper()][0]["quotes"]
+        ]
+    except Exception as e:
+        return f"An unexpected error occurred during historical data processing for {symbol}: {e}"
+
+    # --- Process latest price data ---
+    try:
+        if isinstance(latest_data, Exception):
+            raise latest_data
+        data = latest_data
+
+        new_data = data["data"][coin["symbol"].upper()][0]["quote"]["USD"]
+        # Align the latest quote with the historical ones, which carry "timestamp".
+        # Build a new dict so the cached response is not mutated.
+        new_data = {**new_data, "timestamp": new_data["last_updated"]}
+    except Exception as e:
+        return f"An unexpected error occurred during latest data processing for {symbol}: {e}"
+
+    # Combine historical and latest data. The series are small, so plain lists
+    # are used without building a DataFrame.
+    values.append(new_data)
+    return coin, values
+
+
+async def crypto_data(symbol: str) -> str:
+    """
+    Provides the OHLCV data of a cryptocurrency as JSON, for clients which render
+    the chart themselves instead of using `plot_crypto`.
+
+    Args:
+        symbol: The cryptocurrency symbol (e.g., "BTC", "ETH") or slug (e.g., "bitcoin").
+                Note that only token on the list is allowed.
+
+    Returns:
+        A JSON string with the coin details under "meta" and the daily quotes,
+        ending with the latest one, under "ohlcv", or an error message if the
+        token is not found or data retrieval fails.
+    """
+    result = await fetch_crypto_data(symbol)
+    if isinstance(result, str):
+        return result  # Error message
+    coin, values = result
+    ohlcv = [
+        {
+            "timestamp": x["timestamp"],
+            "open": x["open"],
+            "high": x["high"],
+            "low": x["low"],
+            "close": x["close"],
+            "volume": x["volume"],
+        }
+        for x in values
+    ]
+    meta = {"name": coin["name"], "symbol": coin["symbol"].upper()}
+    return orjson.dumps({"meta": meta, "ohlcv": ohlcv}).decode()
+
 
-    # Make gridlines thinner and grey for both axes.
-    fig.update_xaxes(gridwidth=0.5, gridcolor="rgba(100, 100, 100, 0.4)")
-    fig.update_yaxes(gridwidth=0.5, gridcolor="rgba(100, 100, 100, 0.4)")
+async def plot_crypto(symbol: str) -> str:
+    """
+    Generates and saves an OHLCV (Open-High-Low-Close-Volume) candlestick chart
+    for a given cryptocurrency symbol.
+
+    It fetches historical and latest OHLCV data from CoinMarketCap, processes it,
+    creates a Plotly chart, and saves it as an SVG file, a gzipped SVG file, and
+    the figure JSON from which a PNG is rendered on demand. A URL to the saved
+    chart is returned.
+
+    Args:
+        symbol: The cryptocurrency symbol (e.g., "BTC", "ETH") or slug (e.g., "bitcoin")
+                to plot. Note that only token on the list is allowed.
+
+    Returns:
+        A string containing a URL to the generated chart, or an error message if the
+        token is not found or data retrieval fails.
+    """
+    result = await fetch_crypto_data(symbol)
+    if isinstance(result, str):
+        return result  # Error message
+    coin, values = result
+
+    # Use date only for x-axis ticks.
+    dates = [datetime.fromisoformat(x["timestamp"]).date() for x in values]
+
+    # --- Plot the chart using Plotly ---
+    # Start from the prebuilt layout so it is not rebuilt and validated again.
+    fig = new_figure(CRYPTO_LAYOUT)
+    # Set the chart title.
+    fig.layout.title.text = f"{coin['name']} ({coin['symbol'].upper()}) Price & Volume"
+
+    # Add Candlestick Trace to the first row.
+    fig.add_trace(
+        go.Candlestick(
+            x=dates,
+            open=[x["open"] for x in values],
+            high=[x["high"] for x in values],
+            low=[x["low"] for x in values],
+            close=[x["close"] for x in values],
+            name="Price",  # Name for the legend
+            # Place on the first row. The figure has no subplot grid, so the
+            # axes of the template's subplots are referenced directly.
+            xaxis="x",
+            yaxis="y",
+        ),
+    )
+
+    # Add Volume Bar Trace to the second row.
+    fig.add_trace(
+        go.Bar(
+            x=dates,
+            y=[x["volume"] for x in values],
+            name="Volume",
+            marker_color="rgba(0, 0, 255, 0.5)",
+            xaxis="x2",  # Place on the second row
+            yaxis="y2",
+        ),
+    )
+
+    # Try to load and embed a cryptocurrency logo image (if available) for the chart.
+    img_base64 = load_coin_logo(coin["id"])
 
     # Add the cryptocurrency logo as a layout image if available.
     if img_base64 is not None:
@@ -263,31 +821,21 @@ def plot_crypto(symbol: str) -> str:
             )
         )
 
-    # Create the directory to save plots if it doesn't exist.
-    os.makedirs(FOLDER, exist_ok=True)
-
-    # Generate a unique file ID and construct the full path for the SVG image.
-    file_id = generate_unique_file_id()
-    filename = os.path.join(FOLDER, f"{file_id}.svg")
-    # Write the Plotly figure to an SVG file.
-    fig.write_image(filename, width=1200, height=600)
+    # Render and save the chart in every format of `PLOT_FORMATS` but "png".
+    file_id = await save_plot(fig)
     # Construct the public URL for the generated chart.
     link = f"{LINK_PREFIX}{file_id}"
     return f"Chart generated at {link}"
 
 
-def plot_heatmap() -> str:
+async def fetch_heatmap_data() -> list[dict[str, Any]] | str:
     """
-    Generates and saves a cryptocurrency heatmap based on trending data.
-
-    It fetches trending cryptocurrency data from CoinMarketCap, processes it to
-    determine size (based on volume change) and color (based on price change)
-    for each cryptocurrency, creates a Plotly Treemap, and saves it as an SVG file.
-    A URL to the saved chart and a JSON string of raw data are returned.
+    Fetches the top 20 trending cryptocurrencies from CoinMarketCap.
 
     Returns:
-        A string containing a URL to the generated heatmap chart and a JSON string
-        of the raw data used for the heatmap.
+        A list with the price, name, symbol, 24h price change (in %) and 24h volume
+        change (in %) of each cryptocurrency, or an error message if data
+        retrieval fails.
     """
     # Parameters for the trending (heatmap) API request.
     params = {
@@ -295,9 +843,7 @@ def plot_heatmap() -> str:
     }
 
     try:
-        response = requests.get(HEATMAP_API, headers=CMC_HEADER, params=params)
-        response.raise_for_status()
-        data = response.json()
+        data = await _cached_get(HEATMAP_API, params, HEATMAP_TTL)
     except Exception as e:
         return f"An unexpected error occurred during heatmap data retrieval: {e}"
 
@@ -313,126 +859,151 @@ def plot_heatmap() -> str:
                 "vol_change": x["quote"]["USD"]["volume_change_24h"],
             }
         )
+    return graph_data
+
+
+async def heatmap_data() -> str:
+    """
+    Provides the data of the heatmap as JSON, for clients which render the chart
+    themselves instead of using `plot_heatmap`.
+
+    Returns:
+        A JSON string of the list returned by `fetch_heatmap_data`, or an error
+        message if data retrieval fails.
+    """
+    graph_data = await fetch_heatmap_data()
+    if isinstance(graph_data, str):
+        return graph_data  # Error message
+    return orjson.dumps(graph_data).decode()
+
+
+async def plot_heatmap() -> str:
+    """
+    Generates and saves a cryptocurrency heatmap based on trending data.
+
+    It fetches trending cryptocurrency data from CoinMarketCap, processes it to
+    determine size (based on volume change) and color (based on price change)
+    for each cryptocurrency, creates a Plotly Treemap, and saves it as an SVG file,
+    a gzipped SVG file, and the figure JSON from which a PNG is rendered on demand.
+    A URL to the saved chart and a JSON string of raw data are returned.
+
+    Returns:
+        A string containing a URL to the generated heatmap chart and a JSON string
+        of the raw data used for the heatmap.
+    """
+    graph_data = await fetch_heatmap_data()
+    if isinstance(graph_data, str):
+        return graph_data  # Error message
     df = pd.DataFrame(graph_data)
 
     # Calculate 'values' for the treemap, which determine the size of each block.
     # Here, it's based on the absolute 24h volume change, clamped between 1 and 2000.
-    values = [abs(x) for x in df["vol_change"]]
-    values = [1 if x < 1 else x if x < 2000 else 2000 for x in values]
+    # A missing volume change gets the largest size.
+    values = np.clip(np.abs(df["vol_change"].to_numpy(dtype=float)), 1, 2000)
+    values = np.where(np.isnan(values), 2000, values)
 
     # Calculate size fractions for dynamic font sizing and label generation.
-    total_size = sum(values)
-    size_fractions = [x / total_size for x in values]
-
-    def gen_label(
-        symbol: str,
-        price: float,
-        price_change: float,
-        fraction: float,
-    ) -> str:
-        """
-        Generates the HTML label for each block in the treemap.
-        The label content and font size adapt based on the block's size (fraction).
-        """
-        if fraction < 0.01:  # For very small blocks, just show symbol
-            return symbol
-
-        # Format price based on its magnitude.
-        price_text = f"{price:.4g}" if price < 1 else f"{price:.2f}"
-
-        # Format price change text (with +/- sign).
-        if price_change > 0:
-            price_change_text = f"+{price_change:.2f}%"
-            priceline = f"{price_text} ({price_change_text})"
-        elif price_change < 0:
-            price_change_text = f"{price_change:.2f}%"  # Will have - sign
-            priceline = f"{price_text} ({price_change_text})"
-        else:
-            priceline = "--"
-            price_change_text = "--"
-
-        # Determine font size dynamically based on the fraction (logarithmic scale).
-        # This makes larger blocks have proportionally larger text.
-        size = math.log(fraction / 0.01) + 1
-        if size < 0.5:
-            size = 0.5  # Minimum font size to prevent illegibility
+    size_fractions = values / values.sum()
 
-        if (
-            fraction < 0.02
-        ):  # For small to medium blocks, show symbol and percentage change
-            return f"<span style='font-size: {size}em;'>{symbol}</span><br />{price_change_text}"
+    price_changes = df["price_change"].to_numpy(dtype=float)
+
+    # Determine font size dynamically based on the fraction (logarithmic scale).
+    # This makes larger blocks have proportionally larger text, with a minimum
+    # font size to prevent illegibility.
+    font_sizes = np.maximum(np.log(size_fractions / 0.01) + 1, 0.5)
 
-        # For larger blocks, show symbol, price, and percentage change.
-        return f"<span style='font-size: {size}em;'>{symbol}</span><br />{priceline}"
+    # Format price change text (with +/- sign), or "--" if there is no change.
+    price_change_texts = [
+        f"{x:+.2f}%" if x > 0 or x < 0 else "--" for x in price_changes.tolist()
+    ]
+
+    # Format price based on its magnitude, then the price line shown with it,
+    # or "--" if there is no change.
+    price_texts = [f"{x:.4g}" if x < 1 else f"{x:.2f}" for x in df["price"].tolist()]
+    price_lines = [
+        f"{price_text} ({change_text})" if change_text != "--" else "--"
+        for price_text, change_text in zip(price_texts, price_change_texts)
+    ]
 
-    # Generate labels for all cryptocurrencies in the DataFrame.
+    # Generate the HTML label for each block in the treemap. The label content
+    # and font size adapt based on the block's size (fraction):
+    # - very small blocks only show the symbol,
+    # - small to medium blocks show the symbol and percentage change,
+    # - larger blocks show the symbol, price, and percentage change.
     labels = [
-        gen_label(symbol, price, price_change, fraction)
-        for symbol, price, price_change, fraction in zip(
-            df["symbol"],
-            df["price"],
-            df["price_change"],
-            size_fractions,
+        (
+            symbol
+            if fraction < 0.01
+            else (
+                HEATMAP_LABEL.format(size, symbol, change_text)
+                if fraction < 0.02
+                else HEATMAP_LABEL.format(size, symbol, price_line)
+            )
+        )
+        for symbol, change_text, price_line, fraction, size in zip(
+            df["symbol"].tolist(),
+            price_change_texts,
+            price_lines,
+            size_fractions.tolist(),
+            font_sizes.tolist(),
         )
     ]
 
     # Determine the maximum absolute price change for color scaling.
     # Add a floor of 2 to avoid log(0) or very small numbers causing issues.
-    max_positive = math.log(
-        df["price_change"].max() if any(df["price_change"] > 1) else 2
-    )
-    max_negative = math.log(
-        -df["price_change"].min() if any(df["price_change"] < -1) else 2
-    )
+    # Missing price changes are ignored, and their blocks stay neutral below.
+    positive = price_changes > 1
+    negative = price_changes < -1
+    max_positive = np.log(np.nanmax(price_changes) if positive.any() else 2)
+    max_negative = np.log(-np.nanmin(price_changes) if negative.any() else 2)
     max_price_change = max(max_positive, max_negative)
 
-    colors = []
     # Assign colors based on price change: green for positive, red for negative, grey for neutral.
     # Intensity of color scales with the magnitude of price change.
-    for val in df["price_change"]:
-        if val > 1:
-            # Scale green intensity based on positive price change
-            intensity = 0.2 + 0.6 * (1 - math.log(val) / max_price_change)
-            colors.append(f"rgb(0, {int(intensity*255)}, 0)")
-        elif val < -1:
-            # Scale red intensity based on negative price change
-            intensity = 0.2 + 0.6 * (1 - math.log(-val) / max_price_change)
-            colors.append(f"rgb({int(intensity*255)}, 0, 0)")
-        else:
-            # Neutral color for small changes (-1% to +1%)
-            colors.append("rgb(100, 100, 100)")
-
-    # Create the Treemap figure.
-    fig = go.Figure(
+    log_changes = np.log(
+        np.abs(price_changes),
+        out=np.zeros_like(price_changes),
+        where=positive | negative,
+    )
+    intensities = (0.2 + 0.6 * (1 - log_changes / max_price_change)) * 255
+    colors = [
+        (
+            f"rgb(0, {intensity}, 0)"  # Green for positive price change
+            if pos
+            else (
+                f"rgb({intensity}, 0, 0)"  # Red for negative price change
+                if neg
+                else "rgb(100, 100, 100)"  # Neutral color for small changes (-1% to +1%)
+            )
+        )
+        for intensity, pos, neg in zip(
+            intensities.astype(int).tolist(), positive.tolist(), negative.tolist()
+        )
+    ]
+
+    # Create the Treemap figure from the prebuilt layout.
+    fig = new_figure(HEATMAP_LAYOUT)
+    fig.add_trace(
         go.Treemap(
             labels=labels,  # Text labels for each block
             parents=[""]
             * len(labels),  # All blocks are top-level children of an invisible root
-            values=values,  # Determines the size of each block
+            values=values.tolist(),  # Determines the size of each block
             marker_colors=colors,  # Determines the color of each block
         )
     )
 
-    # Update trace properties for rounded corners.
-    fig.update_traces(marker=dict(cornerradius=5))
-    # Set margins to 0 for a tight fit, maximizing chart area.
-    fig.update_layout(margin=dict(t=0, l=0, r=0, b=0))
-
-    # Configure text positioning within the treemap blocks.
+    # Update trace properties for rounded corners, and configure text positioning
+    # within the treemap blocks.
     fig.update_traces(
+        marker=dict(cornerradius=5),
         textposition="middle center",  # Align text horizontally and vertically center
-        textinfo="label",  # Show only the label generated by `gen_label`
+        textinfo="label",  # Show only the labels built above from `HEATMAP_LABEL`
     )
 
-    # Create the directory to save plots if it doesn't exist.
-    os.makedirs(FOLDER, exist_ok=True)
-
-    # Generate a unique file ID and construct the full path for the SVG image.
-    file_id = generate_unique_file_id()
-    filename = os.path.join(FOLDER, f"{file_id}.svg")
-    # Write the Plotly figure to an SVG file.
-    fig.write_image(filename, width=1200, height=600)
+    # Render and save the chart in every format of `PLOT_FORMATS` but "png".
+    file_id = await save_plot(fig)
     # Construct the public URL for the generated chart.
     link = f"{LINK_PREFIX}{file_id}"
     # Return the link to the chart and the raw data in JSON format.
-    return f"Chart generated at {link}\nRaw data is {json.dumps(df.to_dict(orient='records'))}"  # Use orient='records' for list of dicts
+    return f"Chart generated at {link}\nRaw data is {orjson.dumps(graph_data).decode()}"